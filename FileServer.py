@@ -8,13 +8,26 @@ Usage with uv:
 
 import os
 import sys
+import stat
+import errno
+import shutil
 import base64
-import json
+import io
+import re
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Set, Tuple
 import mimetypes
 import fnmatch
-import difflib
+from json.encoder import encode_basestring_ascii
+
+# Prefer the C-accelerated difflib port when available
+try:
+    import cydifflib as difflib
+except ImportError:
+    import difflib
 
 from mcp.server.fastmcp import FastMCP
 
@@ -24,13 +37,38 @@ mcp = FastMCP("secure-filesystem-server")
 # Global allowed directories
 allowed_directories: List[str] = []
 
+# Allowed directories precomputed for validate_path: exact matches, and
+# separator-terminated prefixes for a single str.startswith(tuple) check
+allowed_directory_set: Set[str] = set()
+allowed_directory_prefixes: Tuple[str, ...] = ()
+
+# Parent directories already created or confirmed by write_file_content
+known_directories: Set[str] = set()
+
+# Buffer size for file I/O (1 MiB) to cut read/write syscalls on large files
+IO_BUFFER_SIZE = 1024 * 1024
+
+# Block size used when scanning backwards from the end of a file
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# directory_tree output beyond this many characters is returned without indentation
+LARGE_TREE_OUTPUT_SIZE = 64 * 1024
+
+# Units for format_size, each 1024 times the previous
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Maximum number of threads used to read files concurrently in read_text_files
+MAX_READ_WORKERS = 8
+
 
 # Helper functions
+@functools.lru_cache(maxsize=4096)
 def expand_home(path: str) -> str:
     """Expand ~ to home directory"""
     return os.path.expanduser(path)
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_path(path: str) -> str:
     """Normalize path separators and resolve"""
     return os.path.normpath(path)
@@ -38,13 +76,16 @@ def normalize_path(path: str) -> str:
 
 def set_allowed_directories(directories: List[str]):
     """Set the global allowed directories"""
-    global allowed_directories
+    global allowed_directories, allowed_directory_set, allowed_directory_prefixes
     allowed_directories = directories
+    allowed_directory_set = set(directories)
+    allowed_directory_prefixes = tuple(directory.rstrip(os.sep) + os.sep for directory in directories)
 
 
 def validate_path(file_path: str) -> str:
     """Validate that a path is within allowed directories"""
-    # Expand and resolve the path
+    # Expand and resolve the path. realpath() is deliberately not cached:
+    # symlinks can change between calls and must be re-resolved every time.
     expanded = expand_home(file_path)
     absolute = os.path.abspath(expanded)
     
@@ -56,168 +97,404 @@ def validate_path(file_path: str) -> str:
         normalized = normalize_path(absolute)
     
     # Check if path is within allowed directories
-    for allowed_dir in allowed_directories:
-        if normalized.startswith(allowed_dir):
-            return normalized
+    # Compare against the separator-terminated form so /foo does not match /foobar
+    if normalized in allowed_directory_set or normalized.startswith(allowed_directory_prefixes):
+        return normalized
     
     raise ValueError(f"Access denied: {file_path} is outside allowed directories")
 
 
+@functools.lru_cache(maxsize=256)
+def compile_patterns(patterns: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """Compile glob patterns into a single regex (None if no patterns)"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(os.path.normcase(pat))})' for pat in patterns))
+
+
+def matches_pattern(name: str, regex: Optional[re.Pattern]) -> bool:
+    """Check a name against a compiled glob regex, with fnmatch case semantics"""
+    return regex is not None and regex.match(os.path.normcase(name)) is not None
+
+
+@functools.lru_cache(maxsize=1024)
+def guess_mime_type(suffixes: str) -> str:
+    """Guess a file's MIME type from its extension(s), e.g. '.png' or '.tar.gz'"""
+    mime_type, _ = mimetypes.guess_type('file' + suffixes)
+    return mime_type or "application/octet-stream"
+
+
 def format_size(size: int) -> str:
     """Format file size in human-readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size < 1024.0:
-            return f"{size:.1f} {unit}"
-        size /= 1024.0
-    return f"{size:.1f} PB"
+    # Each unit spans 10 bits, so the bit length picks the unit directly
+    index = max(0, min(len(SIZE_UNITS) - 1, (size.bit_length() - 1) // 10))
+    return f"{size / (1 << (index * 10)):.1f} {SIZE_UNITS[index]}"
 
 
-def read_file_content(file_path: str) -> str:
-    """Read file content as text"""
+def decode_text(data: bytes) -> str:
+    """Decode file bytes as text, falling back to latin-1 for non-UTF-8 data"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        text = data.decode('utf-8')
     except UnicodeDecodeError:
         # Try with different encoding
-        with open(file_path, 'r', encoding='latin-1') as f:
-            return f.read()
+        text = data.decode('latin-1')
+    # Match text-mode universal newline handling (skipped when there is no \r)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
 
 
-def write_file_content(file_path: str, content: str):
-    """Write content to file"""
-    # Ensure parent directory exists
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+def read_file_content(file_path: str) -> str:
+    """Read file content as text"""
+    # Read the bytes once so the encoding fallback doesn't re-read the file
+    return decode_text(Path(file_path).read_bytes())
 
 
-def read_file_as_base64(file_path: str) -> str:
-    """Read file and encode as base64"""
+def write_file_content(file_path: str, content: str):
+    """Write content to file"""
+    # Encode once up front, applying the same newline translation as text mode
+    if os.linesep != '\n':
+        content = content.replace('\n', os.linesep)
+    data = content.encode('utf-8')
+    
+    # Ensure parent directory exists, skipping the makedirs stat for known directories
+    parent = os.path.dirname(file_path)
+    if parent not in known_directories:
+        os.makedirs(parent, exist_ok=True)
+        known_directories.add(parent)
+    
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    try:
+        fd = os.open(file_path, flags, 0o666)
+    except FileNotFoundError:
+        # The cached parent was removed since we last saw it
+        known_directories.discard(parent)
+        os.makedirs(parent, exist_ok=True)
+        known_directories.add(parent)
+        fd = os.open(file_path, flags, 0o666)
+    
+    # Write directly to the descriptor, bypassing Python's I/O buffering layer
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def read_base64_preview(file_path: str, num_chars: int) -> Tuple[str, int]:
+    """Return the first num_chars of a file's base64 encoding and the full encoded length"""
+    # Every 3 input bytes encode to 4 base64 characters, so only the
+    # leading bytes need to be read; the length follows from the file size
     with open(file_path, 'rb') as f:
-        return base64.b64encode(f.read()).decode('utf-8')
+        size = os.fstat(f.fileno()).st_size
+        prefix = f.read((num_chars + 3) // 4 * 3)
+    
+    encoded = base64.b64encode(prefix).decode('utf-8')
+    return encoded[:num_chars], (size + 2) // 3 * 4
 
 
 def get_file_stats(file_path: str) -> Dict[str, Any]:
     """Get file statistics"""
     stats = os.stat(file_path)
+    # Derive the file type from st_mode rather than stat-ing again via os.path
     return {
         'size': format_size(stats.st_size),
         'created': stats.st_ctime,
         'modified': stats.st_mtime,
         'accessed': stats.st_atime,
-        'isDirectory': os.path.isdir(file_path),
-        'isFile': os.path.isfile(file_path),
+        'isDirectory': stat.S_ISDIR(stats.st_mode),
+        'isFile': stat.S_ISREG(stats.st_mode),
         'permissions': oct(stats.st_mode)[-3:],
     }
 
 
 def tail_file(file_path: str, num_lines: int) -> str:
     """Read last N lines of a file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-        return ''.join(lines[-num_lines:])
+    blocks = []
+    newlines = 0
+    with open(file_path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        # Read backwards until we have one more newline than lines wanted,
+        # so the first requested line is known to be complete
+        while pos > 0 and newlines <= num_lines:
+            block_size = min(TAIL_BLOCK_SIZE, pos)
+            pos -= block_size
+            f.seek(pos)
+            block = f.read(block_size)
+            newlines += block.count(b'\n')
+            blocks.append(block)
+    
+    data = b''.join(reversed(blocks))
+    return decode_text(b''.join(data.splitlines(keepends=True)[-num_lines:]))
 
 
 def head_file(file_path: str, num_lines: int) -> str:
     """Read first N lines of a file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = []
-        for i, line in enumerate(f):
-            if i >= num_lines:
-                break
-            lines.append(line)
-        return ''.join(lines)
+    with open(file_path, 'r', encoding='utf-8', buffering=IO_BUFFER_SIZE) as f:
+        return ''.join(itertools.islice(f, num_lines))
 
 
-def search_files(directory: str, pattern: str, exclude_patterns: Optional[List[str]] = None) -> List[str]:
+def find_files(directory: str, pattern: str, exclude_patterns: Optional[List[str]] = None) -> List[str]:
     """Search for files matching a pattern"""
     if exclude_patterns is None:
         exclude_patterns = []
     
+    # Translate the globs to regexes once rather than on every fnmatch call
+    pattern_re = compile_patterns((pattern,))
+    exclude_re = compile_patterns(tuple(exclude_patterns))
+    
     matches = []
-    for root, dirs, files in os.walk(directory):
-        # Filter out excluded directories
-        dirs[:] = [d for d in dirs if not any(fnmatch.fnmatch(d, pat) for pat in exclude_patterns)]
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        # Prune excluded directories by name; like os.walk,
+                        # don't descend into symlinked directories
+                        if not entry.is_symlink() and not matches_pattern(entry.name, exclude_re):
+                            subdirs.append(entry.path)
+                    # Matching files are excluded by their full path (fnmatch's * also matches separators)
+                    elif matches_pattern(entry.name, pattern_re) and not matches_pattern(entry.path, exclude_re):
+                        matches.append(entry.path)
+        except OSError:
+            continue
         
-        for filename in files:
-            if fnmatch.fnmatch(filename, pattern):
-                full_path = os.path.join(root, filename)
-                if not any(fnmatch.fnmatch(full_path, pat) for pat in exclude_patterns):
-                    matches.append(full_path)
+        # Push in reverse so directories are visited in listing order, as os.walk does
+        stack.extend(reversed(subdirs))
     
     return matches
 
 
-def apply_file_edits(file_path: str, edits: List[Dict[str, str]], dry_run: bool = False) -> str:
-    """Apply edits to a file and return diff"""
+def split_lines(text: str) -> List[str]:
+    """Split text on newlines, ignoring a trailing newline"""
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def format_diff_range(start: int, stop: int) -> str:
+    """Format a unified diff hunk range the way difflib does"""
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def group_opcodes(opcodes: List[Tuple[str, int, int, int, int]], context: int) -> List[List[Tuple[str, int, int, int, int]]]:
+    """Group opcodes into hunks with up to context lines of context, as SequenceMatcher.get_grouped_opcodes does"""
+    codes = []
+    for code in opcodes:
+        # Merge adjacent equal runs so long unchanged stretches split hunks correctly
+        if codes and code[0] == 'equal' and codes[-1][0] == 'equal':
+            codes[-1] = ('equal', codes[-1][1], code[2], codes[-1][3], code[4])
+        elif code[1] != code[2] or code[3] != code[4]:
+            codes.append(code)
+    if not codes:
+        return []
+    
+    # Trim leading and trailing unchanged runs down to the context size
+    if codes[0][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+    if codes[-1][0] == 'equal':
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+    
+    groups = []
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        # End the current hunk inside an unchanged run too long to bridge
+        if tag == 'equal' and i2 - i1 > context * 2:
+            group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == 'equal'):
+        groups.append(group)
+    
+    return groups
+
+
+def diff_changed_region(old: str, new: str, first_change: int, common_suffix: int, context: int = 3) -> List[str]:
+    """Build unified diff hunks for old -> new from only the lines around the changed region.
+    
+    first_change is the offset of the first differing character and common_suffix
+    the number of trailing characters the two texts share. Only the lines spanning
+    that region are diffed; context lines are taken from the unchanged text around
+    it, so changes can never be aligned against an artificial window edge.
+    """
+    # Lines holding the changed region: from the line holding first_change to
+    # the line holding the start of the common suffix
+    start = old.rfind('\n', 0, first_change) + 1
+    end = old.find('\n', len(old) - common_suffix)
+    old_end = len(old) if end < 0 else end + 1
+    new_end = old_end + len(new) - len(old)
+    
+    # Up to context unchanged lines on either side
+    context_start = start
+    for _ in range(context):
+        if context_start == 0:
+            break
+        context_start = old.rfind('\n', 0, context_start - 1) + 1
+    context_end = old_end
+    for _ in range(context):
+        if context_end == len(old):
+            break
+        end = old.find('\n', context_end)
+        context_end = len(old) if end < 0 else end + 1
+    
+    before = split_lines(old[context_start:start])
+    after = split_lines(old[old_end:context_end])
+    old_lines = before + split_lines(old[start:old_end]) + after
+    new_lines = before + split_lines(new[start:new_end]) + after
+    offset = old.count('\n', 0, context_start)
+    
+    # Diff the changed lines only, then wrap them in the surrounding context
+    changed_old = len(old_lines) - len(before) - len(after)
+    changed_new = len(new_lines) - len(before) - len(after)
+    matcher = difflib.SequenceMatcher(None, old_lines[len(before):len(before) + changed_old],
+                                      new_lines[len(before):len(before) + changed_new])
+    opcodes = [('equal', 0, len(before), 0, len(before))]
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        opcodes.append((tag, i1 + len(before), i2 + len(before), j1 + len(before), j2 + len(before)))
+    opcodes.append(('equal', len(before) + changed_old, len(old_lines),
+                    len(before) + changed_new, len(new_lines)))
+    
+    hunks = []
+    for group in group_opcodes(opcodes, context):
+        old_range = format_diff_range(offset + group[0][1], offset + group[-1][2])
+        new_range = format_diff_range(offset + group[0][3], offset + group[-1][4])
+        hunks.append(f"@@ -{old_range} +{new_range} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == 'equal':
+                hunks.extend(' ' + line for line in old_lines[i1:i2])
+                continue
+            if tag in ('replace', 'delete'):
+                hunks.extend('-' + line for line in old_lines[i1:i2])
+            if tag in ('replace', 'insert'):
+                hunks.extend('+' + line for line in new_lines[j1:j2])
+    
+    return hunks
+
+
+def apply_file_edits(file_path: str, edits: List[Dict[str, str]], dry_run: bool = False,
+                     return_diff: bool = True) -> str:
+    """Apply edits to a file and return diff (or a short summary if return_diff is False)"""
     content = read_file_content(file_path)
     
     new_content = content
+    # Edits only change text after their start and before their end, so track
+    # the unchanged leading and trailing character counts for the diff
+    first_change = len(content)
+    common_suffix = len(content)
     for edit in edits:
         old_text = edit['oldText']
         new_text = edit['newText']
         
-        if old_text not in new_content:
+        start = new_content.find(old_text)
+        if start < 0:
             raise ValueError(f"Text to replace not found: {old_text[:50]}...")
         
-        # Check if old_text appears multiple times
-        if new_content.count(old_text) > 1:
+        # Check if old_text appears multiple times (non-overlapping, as str.count does)
+        end = start + len(old_text)
+        if new_content.find(old_text, end if old_text else 1) >= 0:
             raise ValueError(f"Text appears multiple times in file: {old_text[:50]}...")
         
-        new_content = new_content.replace(old_text, new_text, 1)
+        first_change = min(first_change, start)
+        common_suffix = min(common_suffix, len(new_content) - end)
+        new_content = new_content[:start] + new_text + new_content[end:]
     
-    if not dry_run:
+    # Nothing to write or diff if the edits left the content unchanged
+    if new_content != content and not dry_run:
         write_file_content(file_path, new_content)
     
+    if not return_diff and not dry_run:
+        return f"Successfully applied {len(edits)} edit(s) to {file_path}"
+    
+    if new_content == content:
+        return f"--- {file_path}\n+++ {file_path}"
+    
     # Generate simple diff
     diff_lines = []
     diff_lines.append(f"--- {file_path}")
     diff_lines.append(f"+++ {file_path}")
     
-    old_lines = content.splitlines()
-    new_lines = new_content.splitlines()
-    
-    diff = difflib.unified_diff(old_lines, new_lines, lineterm='')
-    diff_lines.extend(diff)
+    hunks = diff_changed_region(content, new_content, first_change, common_suffix)
+    if hunks:
+        # Keep the (empty) file headers difflib.unified_diff used to emit
+        diff_lines.append("--- ")
+        diff_lines.append("+++ ")
+        diff_lines.extend(hunks)
     
     return '\n'.join(diff_lines)
 
 
-def build_directory_tree(directory: str, exclude_patterns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
-    """Build a tree structure of directory contents"""
+def iter_directory_tree_json(directory: str, exclude_patterns: Optional[List[str]] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (compact, indented) JSON fragment pairs for the tree structure of directory contents.
+    
+    Joined, the compact fragments match json.dumps(tree, separators=(',', ':')) and the
+    indented ones match json.dumps(tree, indent=2), so callers can pick either format
+    from a single traversal.
+    """
     if exclude_patterns is None:
         exclude_patterns = []
     
-    result = []
-    
-    try:
-        entries = os.listdir(directory)
-    except PermissionError:
-        return result
+    exclude_re = compile_patterns(tuple(exclude_patterns))
     
-    for entry in sorted(entries):
-        entry_path = os.path.join(directory, entry)
-        
+    def list_entries(dir_path: str) -> List[os.DirEntry]:
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except PermissionError:
+            return []
         # Check if should be excluded
-        should_exclude = any(fnmatch.fnmatch(entry, pat) for pat in exclude_patterns)
-        if should_exclude:
+        return [entry for entry in entries if not matches_pattern(entry.name, exclude_re)]
+    
+    # The JSON is emitted during the traversal, so no dict tree is ever built.
+    # Each stack item iterates the remaining entries of one open directory; an
+    # entry in the list at depth d is indented 4d - 2 spaces and its keys 4d.
+    yield '[', '['
+    stack = [iter(list_entries(directory))]
+    first = True
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            depth = len(stack)
+            stack.pop()
+            if stack:
+                # Close the children list and the directory object holding it
+                children_close = ']' if first else '\n' + ' ' * (4 * depth - 4) + ']'
+                yield ']}', children_close + '\n' + ' ' * (4 * depth - 6) + '}'
+            else:
+                yield ']', ']' if first else '\n]'
+            first = False
             continue
         
-        if os.path.isdir(entry_path):
-            tree_entry = {
-                'name': entry,
-                'type': 'directory',
-                'children': build_directory_tree(entry_path, exclude_patterns)
-            }
+        depth = len(stack)
+        separator = '' if first else ','
+        indent = ('\n' if first else ',\n') + ' ' * (4 * depth - 2)
+        key_indent = ' ' * (4 * depth)
+        name = encode_basestring_ascii(entry.name)
+        if entry.is_dir():
+            yield (separator + '{"name":' + name + ',"type":"directory","children":[',
+                   indent + '{\n' + key_indent + '"name": ' + name + ',\n'
+                   + key_indent + '"type": "directory",\n' + key_indent + '"children": [')
+            stack.append(iter(list_entries(entry.path)))
+            first = True
         else:
-            tree_entry = {
-                'name': entry,
-                'type': 'file'
-            }
-        
-        result.append(tree_entry)
-    
-    return result
+            yield (separator + '{"name":' + name + ',"type":"file"}',
+                   indent + '{\n' + key_indent + '"name": ' + name + ',\n'
+                   + key_indent + '"type": "file"\n' + ' ' * (4 * depth - 2) + '}')
+            first = False
 
 
 # Tool definitions using FastMCP decorators
@@ -244,6 +521,28 @@ def read_text_file(path: str, tail: Optional[int] = None, head: Optional[int] =
         return read_file_content(valid_path)
 
 
+@mcp.tool()
+def read_text_files(paths: List[str]) -> str:
+    """Read the contents of multiple files at once as text.
+    
+    Failed reads are reported per file and don't stop the others.
+    
+    Args:
+        paths: Paths of the files to read
+    """
+    def read_one(path: str) -> str:
+        try:
+            return f"{path}:\n{read_file_content(validate_path(path))}\n"
+        except Exception as e:
+            return f"{path}: Error - {e}"
+    
+    # Reads release the GIL, so a thread pool overlaps their I/O
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_READ_WORKERS, len(paths)))) as executor:
+        results = list(executor.map(read_one, paths))
+    
+    return "\n---\n".join(results)
+
+
 @mcp.tool()
 def read_media_file(path: str) -> str:
     """Read an image or audio file. Returns the base64 encoded data and MIME type.
@@ -253,14 +552,13 @@ def read_media_file(path: str) -> str:
     """
     valid_path = validate_path(path)
     
-    # Get MIME type
-    mime_type, _ = mimetypes.guess_type(valid_path)
-    if not mime_type:
-        mime_type = "application/octet-stream"
+    # Get MIME type. Keyed on the full suffix chain (not just the last extension)
+    # so compound types like .tar.gz resolve as guess_type does for the path.
+    mime_type = guess_mime_type(''.join(Path(valid_path).suffixes))
     
-    data = read_file_as_base64(valid_path)
+    preview, encoded_length = read_base64_preview(valid_path, 100)
     
-    return f"MIME Type: {mime_type}\n\nBase64 Data (first 100 chars):\n{data[:100]}...\n\nFull length: {len(data)} characters"
+    return f"MIME Type: {mime_type}\n\nBase64 Data (first 100 chars):\n{preview}...\n\nFull length: {encoded_length} characters"
 
 
 @mcp.tool()
@@ -277,16 +575,17 @@ def write_file(path: str, content: str) -> str:
 
 
 @mcp.tool()
-def edit_file(path: str, edits: List[Dict[str, str]], dry_run: bool = False) -> str:
+def edit_file(path: str, edits: List[Dict[str, str]], dry_run: bool = False, return_diff: bool = True) -> str:
     """Make line-based edits to a text file. Returns a git-style diff.
     
     Args:
         path: Path to the file to edit
         edits: List of edit operations, each with 'oldText' and 'newText'
         dry_run: If True, preview changes without applying them
+        return_diff: If False, skip generating the diff when applying changes
     """
     valid_path = validate_path(path)
-    return apply_file_edits(valid_path, edits, dry_run)
+    return apply_file_edits(valid_path, edits, dry_run, return_diff)
 
 
 @mcp.tool()
@@ -310,12 +609,12 @@ def list_directory(path: str) -> str:
     """
     valid_path = validate_path(path)
     
-    entries = os.listdir(valid_path)
+    with os.scandir(valid_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
     formatted = []
-    for entry in sorted(entries):
-        entry_path = os.path.join(valid_path, entry)
-        prefix = "[DIR]" if os.path.isdir(entry_path) else "[FILE]"
-        formatted.append(f"{prefix} {entry}")
+    for entry in entries:
+        prefix = "[DIR]" if entry.is_dir() else "[FILE]"
+        formatted.append(f"{prefix} {entry.name}")
     
     return "\n".join(formatted)
 
@@ -330,23 +629,20 @@ def list_directory_with_sizes(path: str, sort_by: str = "name") -> str:
     """
     valid_path = validate_path(path)
     
-    entries = os.listdir(valid_path)
     detailed_entries = []
     
-    for entry in entries:
-        entry_path = os.path.join(valid_path, entry)
-        try:
-            stats = os.stat(entry_path)
+    # DirEntry reuses the type information returned by readdir, so this
+    # avoids the separate isdir() stat per entry
+    with os.scandir(valid_path) as it:
+        for entry in it:
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                size = 0
             detailed_entries.append({
-                'name': entry,
-                'is_directory': os.path.isdir(entry_path),
-                'size': stats.st_size,
-            })
-        except Exception:
-            detailed_entries.append({
-                'name': entry,
-                'is_directory': os.path.isdir(entry_path),
-                'size': 0,
+                'name': entry.name,
+                'is_directory': entry.is_dir(),
+                'size': size,
             })
     
     # Sort entries
@@ -387,8 +683,21 @@ def directory_tree(path: str, exclude_patterns: Optional[List[str]] = None) -> s
     if exclude_patterns is None:
         exclude_patterns = []
     
-    tree_data = build_directory_tree(valid_path, exclude_patterns)
-    return json.dumps(tree_data, indent=2)
+    # Large trees are returned compact; indentation roughly triples their size.
+    # The indented copy is only kept while the output is still under the limit.
+    compact = io.StringIO()
+    indented: Optional[io.StringIO] = io.StringIO()
+    for compact_fragment, indented_fragment in iter_directory_tree_json(valid_path, exclude_patterns):
+        compact.write(compact_fragment)
+        if indented is not None:
+            if compact.tell() > LARGE_TREE_OUTPUT_SIZE:
+                indented = None
+            else:
+                indented.write(indented_fragment)
+    
+    if indented is None:
+        return compact.getvalue()
+    return indented.getvalue()
 
 
 @mcp.tool()
@@ -402,7 +711,14 @@ def move_file(source: str, destination: str) -> str:
     valid_source = validate_path(source)
     valid_dest = validate_path(destination)
     
-    os.rename(valid_source, valid_dest)
+    try:
+        os.replace(valid_source, valid_dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Cross-device move: shutil copies (using copy_file_range/sendfile
+        # where available) and then removes the source
+        shutil.move(valid_source, valid_dest)
     return f"Successfully moved {source} to {destination}"
 
 
@@ -420,7 +736,7 @@ def search_files(path: str, pattern: str, exclude_patterns: Optional[List[str]]
     if exclude_patterns is None:
         exclude_patterns = []
     
-    results = search_files(valid_path, pattern, exclude_patterns)
+    results = find_files(valid_path, pattern, exclude_patterns)
     
     if results:
         return "\n".join(results)
@@ -440,6 +756,24 @@ def get_file_info(path: str) -> str:
     return "\n".join(f"{k}: {v}" for k, v in info.items())
 
 
+@mcp.tool()
+def get_file_infos(paths: List[str]) -> str:
+    """Retrieve detailed metadata about multiple files or directories at once.
+    
+    Args:
+        paths: Paths of the files or directories
+    """
+    results = []
+    for path in paths:
+        try:
+            info = get_file_stats(validate_path(path))
+            results.append(f"{path}:\n" + "\n".join(f"{k}: {v}" for k, v in info.items()))
+        except Exception as e:
+            results.append(f"{path}: Error - {e}")
+    
+    return "\n---\n".join(results)
+
+
 @mcp.tool()
 def list_allowed_directories() -> str:
     """Returns the list of directories that this server is allowed to access."""
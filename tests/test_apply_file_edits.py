@@ -0,0 +1,62 @@
+"""Regression tests for the diffs returned by apply_file_edits."""
+
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import FileServer  # noqa: E402
+
+
+pytestmark = pytest.mark.skipif(shutil.which('git') is None, reason="git is required to apply diffs")
+
+
+def assert_diff_applies(tmp_path: Path, content: str, edits: list):
+    """Apply edits as a dry run, then check git applies the returned diff to the original"""
+    target = tmp_path / 'target.txt'
+    target.write_text(content, newline='')
+    
+    diff = FileServer.apply_file_edits(str(target), edits, dry_run=True)
+    hunks = diff.split('\n')[4:]
+    assert hunks, "expected a non-empty diff"
+    
+    patch = tmp_path / 'change.patch'
+    patch.write_text('--- a/target.txt\n+++ b/target.txt\n' + '\n'.join(hunks) + '\n', newline='')
+    subprocess.run(['git', 'apply', '--check', patch.name], cwd=tmp_path, check=True)
+    subprocess.run(['git', 'apply', patch.name], cwd=tmp_path, check=True)
+    
+    expected = content
+    for edit in edits:
+        expected = expected.replace(edit['oldText'], edit['newText'], 1)
+    assert target.read_text() == expected
+
+
+def test_diff_keeps_context_on_repetitive_content(tmp_path):
+    content = '\n}\nc\n\na\n}\nc\na\nb\nc\n}\nb\nb\na\nb\na\nb\na\nc\n}\nc\n'
+    assert_diff_applies(tmp_path, content, [{'oldText': '\nb\nb\n', 'newText': ''}])
+
+
+def test_random_edits_on_repetitive_lines_apply(tmp_path):
+    rng = random.Random(0)
+    vocabulary = ['}', '', 'a', 'b', 'c', '    return x;']
+    
+    for _ in range(200):
+        content = '\n'.join(rng.choice(vocabulary) for _ in range(400)) + '\n'
+        lines = content.split('\n')[:-1]
+        
+        # Grow the replaced block until it is unique in the file
+        start = rng.randrange(len(lines))
+        end = start + 1
+        while end < len(lines) and content.count('\n'.join(lines[start:end]) + '\n') != 1:
+            end += 1
+        old_text = '\n'.join(lines[start:end]) + '\n'
+        new_text = ''.join(rng.choice(vocabulary) + '\n' for _ in range(rng.randint(0, 3)))
+        if content.count(old_text) != 1 or new_text == old_text:
+            continue
+        
+        assert_diff_applies(tmp_path, content, [{'oldText': old_text, 'newText': new_text}])